@@ -5,32 +5,103 @@ This application provides SCIM 2.0 compliant endpoints for user provisioning
 with support for multiple realms and secure authentication.
 """
 
+from contextlib import asynccontextmanager
+import anyio
+import atexit
 from fastapi import FastAPI, HTTPException, status
 from fastapi.middleware.cors import CORSMiddleware
-from fastapi.responses import JSONResponse
+from fastapi.middleware.gzip import GZipMiddleware
 import logging
+import logging.handlers
+import os
+import queue
 import uvicorn
 
-from .models import create_tables
+from .models import create_tables, SKIP_CREATE_TABLES_ENV
+from .init_db import init_database
+from .responses import ORJSONResponse
+from .middleware import GZipRequestMiddleware
 from .endpoints.scim_endpoints import router as scim_router
 from .endpoints.admin_endpoints import router as admin_router
 
+
+def configure_logging() -> None:
+    """
+    Route all log records through a queue so handler I/O (stderr writes)
+    happens on a background listener thread instead of the request path.
+
+    Runs when this module is imported, so it also sets up logging for the
+    launcher scripts that import serve(). Handlers already on the root logger
+    at that point (e.g. installed by an embedding application) are moved
+    behind the queue; otherwise a stderr handler is created. Calling this
+    more than once is a no-op.
+    """
+    root = logging.getLogger()
+    if any(isinstance(handler, logging.handlers.QueueHandler) for handler in root.handlers):
+        return
+
+    handlers = list(root.handlers)
+    if not handlers:
+        stream_handler = logging.StreamHandler()
+        stream_handler.setFormatter(logging.Formatter(
+            "%(asctime)s - %(name)s - %(levelname)s - %(message)s"
+        ))
+        handlers = [stream_handler]
+
+    log_queue = queue.SimpleQueue()
+    listener = logging.handlers.QueueListener(log_queue, *handlers, respect_handler_level=True)
+    for handler in root.handlers[:]:
+        root.removeHandler(handler)
+    root.addHandler(logging.handlers.QueueHandler(log_queue))
+    root.setLevel(logging.INFO)
+    listener.start()
+    atexit.register(listener.stop)
+
+
 # Configure logging
-logging.basicConfig(
-    level=logging.INFO,
-    format="%(asctime)s - %(name)s - %(levelname)s - %(message)s"
-)
+configure_logging()
 logger = logging.getLogger(__name__)
 
+# Threads available for sync route handlers and dependencies (anyio default: 40)
+THREADPOOL_SIZE = int(os.getenv("THREADPOOL_SIZE", "100"))
+
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    """
+    Size the handler threadpool and initialize database tables on startup
+    unless the launcher already did.
+    """
+    logger.info("Starting SCIM 2.0 Endpoints application...")
+    anyio.to_thread.current_default_thread_limiter().total_tokens = THREADPOOL_SIZE
+    if os.getenv(SKIP_CREATE_TABLES_ENV) == "1":
+        logger.info("Database tables initialized by launcher, skipping creation")
+    else:
+        create_tables()
+        logger.info("Database tables initialized successfully")
+    yield
+
+
 # Create FastAPI application
 app = FastAPI(
     title="SCIM 2.0 Endpoints",
     description="SCIM 2.0 compliant endpoints for user provisioning with multi-realm support",
     version="1.0.0",
     docs_url="/docs",
-    redoc_url="/redoc"
+    redoc_url="/redoc",
+    default_response_class=ORJSONResponse,
+    lifespan=lifespan
 )
 
+# Accept gzip-compressed request bodies (Content-Encoding: gzip)
+app.add_middleware(GZipRequestMiddleware)
+
+# Compress larger responses such as user list pages. Level 5 keeps most of
+# the size reduction on repetitive SCIM JSON at a fraction of level 9's CPU.
+# Added before CORS so that CORS stays the outermost middleware and answers
+# preflights directly.
+app.add_middleware(GZipMiddleware, minimum_size=1024, compresslevel=5)
+
 # Add CORS middleware
 app.add_middleware(
     CORSMiddleware,
@@ -48,7 +119,7 @@ app.include_router(admin_router, prefix="", tags=["Admin"])
 @app.exception_handler(HTTPException)
 async def http_exception_handler(request, exc):
     """Handle HTTP exceptions with SCIM error format."""
-    return JSONResponse(
+    return ORJSONResponse(
         status_code=exc.status_code,
         content={
             "schemas": ["urn:ietf:params:scim:api:messages:2.0:Error"],
@@ -57,13 +128,6 @@ async def http_exception_handler(request, exc):
         }
     )
 
-@app.on_event("startup")
-async def startup_event():
-    """Initialize database tables on startup."""
-    logger.info("Starting SCIM 2.0 Endpoints application...")
-    create_tables()
-    logger.info("Database tables initialized successfully")
-
 @app.get("/", tags=["Root"])
 async def root():
     """Root endpoint with application information."""
@@ -79,11 +143,34 @@ async def health_check():
     """Public health check endpoint."""
     return {"status": "healthy", "service": "SCIM 2.0 Endpoints"}
 
-if __name__ == "__main__":
-    # For development only - use proper ASGI server in production
+def serve() -> None:
+    """
+    Initialize the database and run the application with production server settings.
+
+    This is the one launch path shared by start_server.py, run_server.py and
+    ``python -m src.app``. uvicorn picks uvloop and httptools when they are
+    installed (uvicorn[standard] does not install uvloop on Windows) and
+    falls back to asyncio and h11 otherwise. Spawns WEB_CONCURRENCY worker
+    processes (defaults to the CPU count) and only enables auto-reload when
+    the DEV environment variable is set. The database is initialized once
+    here rather than concurrently by every worker. Per-request access
+    logging is off unless ACCESS_LOG=1.
+    """
+    dev_mode = bool(os.getenv("DEV"))
+    init_database()
+    os.environ[SKIP_CREATE_TABLES_ENV] = "1"
     uvicorn.run(
-        "app:app",
-        host="0.0.0.0",
-        port=8000,
-        reload=True
+        "src.app:app",
+        host=os.getenv("HOST", "0.0.0.0"),
+        port=int(os.getenv("PORT", "8000")),
+        reload=dev_mode,
+        workers=None if dev_mode else int(os.getenv("WEB_CONCURRENCY", os.cpu_count() or 1)),
+        loop="auto",
+        http="auto",
+        log_level="info",
+        access_log=os.getenv("ACCESS_LOG") == "1"
     )
+
+
+if __name__ == "__main__":
+    serve()
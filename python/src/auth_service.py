@@ -5,13 +5,62 @@ Authentication service for SCIM 2.0 endpoints.
 from fastapi import Depends, HTTPException, status
 from fastapi.security import HTTPBasic, HTTPBasicCredentials
 from sqlalchemy.orm import Session
-from datetime import datetime
+from datetime import datetime, timezone
+from typing import Dict, Tuple
+import hashlib
+import hmac
+import secrets
+import threading
+import time
 
 from .models import get_db
 from .database_service import DatabaseService
 
 security = HTTPBasic()
 
+# Minimum number of seconds between last_login writes for the same admin
+LAST_LOGIN_UPDATE_INTERVAL = 60.0
+
+# Monotonic time of the last persisted last_login, keyed by username
+_last_login_flush: Dict[str, float] = {}
+
+# Successful password verifications are reused for this many seconds
+VERIFY_CACHE_TTL = 300.0
+VERIFY_CACHE_MAX_ENTRIES = 1024
+
+# Per-process key for password fingerprints; plaintext passwords are never cached
+_verify_cache_key = secrets.token_bytes(32)
+
+# (username, password_hash) -> (password fingerprint, expiry)
+_verify_cache: Dict[Tuple[str, str], Tuple[bytes, float]] = {}
+_verify_cache_lock = threading.Lock()
+
+
+def _verify_password_cached(username: str, password: str, password_hash: str) -> bool:
+    """
+    Verify an admin password, skipping bcrypt for recently verified credentials.
+
+    Entries are keyed by the stored hash, so changing a password invalidates them.
+    Only successful verifications are cached.
+    """
+    key = (username, password_hash)
+    fingerprint = hmac.new(_verify_cache_key, password.encode("utf-8"), hashlib.sha256).digest()
+    now = time.monotonic()
+
+    cached = _verify_cache.get(key)
+    if cached is not None and cached[1] > now and hmac.compare_digest(cached[0], fingerprint):
+        return True
+
+    if not DatabaseService.verify_admin_password(password, password_hash):
+        return False
+
+    with _verify_cache_lock:
+        if key not in _verify_cache and len(_verify_cache) >= VERIFY_CACHE_MAX_ENTRIES:
+            # Evict the oldest entry (dicts keep insertion order)
+            _verify_cache.pop(next(iter(_verify_cache)))
+        _verify_cache[key] = (fingerprint, now + VERIFY_CACHE_TTL)
+    return True
+
 
 def authenticate_admin(
     credentials: HTTPBasicCredentials = Depends(security),
@@ -30,16 +79,20 @@ def authenticate_admin(
             headers={"WWW-Authenticate": "Basic"},
         )
     
-    if not DatabaseService.verify_admin_password(credentials.password, admin_user.password_hash):
+    if not _verify_password_cached(credentials.username, credentials.password, admin_user.password_hash):
         raise HTTPException(
             status_code=status.HTTP_401_UNAUTHORIZED,
             detail="Invalid authentication credentials",
             headers={"WWW-Authenticate": "Basic"},
         )
     
-    # Update last login
-    admin_user.last_login = datetime.utcnow()
-    db.commit()
+    # Update last login, throttled so reads don't each cost a write transaction
+    now = time.monotonic()
+    last_flush = _last_login_flush.get(admin_user.username)
+    if last_flush is None or now - last_flush >= LAST_LOGIN_UPDATE_INTERVAL:
+        _last_login_flush[admin_user.username] = now
+        admin_user.last_login = datetime.now(timezone.utc).replace(tzinfo=None)
+        db.commit()
     
     return credentials.username
 
@@ -2,23 +2,117 @@
 Database operations service for SCIM 2.0 endpoints.
 """
 
+from __future__ import annotations
+
 from sqlalchemy.orm import Session
-from sqlalchemy import or_, and_
-from typing import List, Optional, Dict, Any
-from passlib.context import CryptContext
-import json
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy import or_, func, select, insert, cast, lambda_stmt, Text, RowMapping, ColumnElement
+from sqlalchemy.dialects.postgresql import JSONB
+from typing import TYPE_CHECKING, List, Optional, Dict, Any
+import base64
+import bcrypt
+import functools
+import orjson
+import os
+import re
+import time
 
 from .models import SCIMUser, SCIMIDP, Realm, AdminUser, generate_unique_id, generate_realm_id
-from .schemas import (
-    SCIMUserCreate, SCIMUserUpdate, RealmCreate, AdminUserCreate
+
+if TYPE_CHECKING:
+    # Only used in annotations; importing the service does not build the models
+    from .schemas import (
+        SCIMUserCreate, SCIMUserUpdate, RealmCreate, AdminUserCreate
+    )
+
+# Password hashing cost; configurable for constrained deployments
+BCRYPT_ROUNDS = int(os.getenv("BCRYPT_ROUNDS", "12"))
+
+# bcrypt only uses the first 72 bytes of a password
+BCRYPT_MAX_PASSWORD_BYTES = 72
+
+
+def _bcrypt_secret(password: str) -> bytes:
+    """Encode a password the way bcrypt consumes it."""
+    return password.encode("utf-8")[:BCRYPT_MAX_PASSWORD_BYTES]
+
+
+# SCIM attribute paths (lower-cased) accepted in list filters
+FILTER_ATTRIBUTES = {
+    "username": SCIMUser.userName,
+    "externalid": SCIMUser.externalId,
+    "displayname": SCIMUser.displayName,
+    "firstname": SCIMUser.firstName,
+    "surname": SCIMUser.surName,
+    "name.givenname": SCIMUser.firstName,
+    "name.familyname": SCIMUser.surName,
+}
+
+# <attrPath> <op> "<value>", e.g. userName eq "bjensen"
+_FILTER_PATTERN = re.compile(r'^\s*([\w.]+)\s+(eq|co|sw|ew)\s+"((?:[^"\\]|\\.)*)"\s*$', re.IGNORECASE)
+
+
+@functools.lru_cache(maxsize=1024)
+def _compile_filter(filter_query: str) -> ColumnElement[bool]:
+    """
+    Translate a list filter into a SQL condition.
+
+    Simple SCIM attribute expressions (eq, co, sw, ew on FILTER_ATTRIBUTES)
+    become a single column comparison; anything else falls back to a
+    substring search over the name fields. Compiled conditions are
+    immutable, so they are cached by filter string.
+    """
+    match = _FILTER_PATTERN.match(filter_query)
+    column = FILTER_ATTRIBUTES.get(match.group(1).lower()) if match else None
+    if column is None:
+        return or_(
+            SCIMUser.userName.contains(filter_query),
+            SCIMUser.displayName.contains(filter_query),
+            SCIMUser.firstName.contains(filter_query),
+            SCIMUser.surName.contains(filter_query)
+        )
+
+    operator = match.group(2).lower()
+    value = re.sub(r'\\(.)', r'\1', match.group(3))
+    if operator == "eq":
+        return column == value
+    if operator == "co":
+        return column.contains(value, autoescape=True)
+    if operator == "sw":
+        return column.startswith(value, autoescape=True)
+    return column.endswith(value, autoescape=True)
+
+
+# Response columns for list pages. emails and schemas are selected as their
+# stored JSON text so they can be embedded without being parsed.
+USER_ROW_COLUMNS = (
+    SCIMUser.user_id,
+    SCIMUser.realm_id,
+    cast(SCIMUser.schemas, Text).label('schemas'),
+    SCIMUser.userName,
+    SCIMUser.externalId,
+    SCIMUser.firstName,
+    SCIMUser.surName,
+    SCIMUser.displayName,
+    SCIMUser.active,
+    cast(SCIMUser.emails, Text).label('emails'),
+    SCIMUser.created_at,
+    SCIMUser.updated_at,
 )
 
-# Password hashing context
-pwd_context = CryptContext(schemes=["bcrypt"], deprecated="auto")
 
+# Realms known to exist, realm_id -> monotonic expiry. Realms cannot be deleted
+# through the API, so positive lookups are safe to reuse for a short while.
+REALM_CACHE_TTL = 60.0
+_known_realms: Dict[str, float] = {}
 
 class DatabaseService:
-    """Service class for database operations."""
+    """
+    Service class for database operations.
+
+    Hot single-row getters use lambda_stmt so the statement is built and
+    compiled once per process; later calls only bind new parameter values.
+    """
 
     @staticmethod
     def create_realm(db: Session, realm_data: RealmCreate) -> Realm:
@@ -30,96 +124,241 @@ class DatabaseService:
         )
         db.add(realm)
         db.commit()
-        db.refresh(realm)
+        _known_realms[realm.realm_id] = time.monotonic() + REALM_CACHE_TTL
         return realm
 
     @staticmethod
     def get_realm_by_id(db: Session, realm_id: str) -> Optional[Realm]:
         """Get realm by realm_id."""
-        return db.query(Realm).filter(Realm.realm_id == realm_id).first()
+        stmt = lambda_stmt(lambda: select(Realm).where(Realm.realm_id == realm_id).limit(1))
+        return db.execute(stmt).scalars().first()
+
+    @staticmethod
+    def realm_exists(db: Session, realm_id: str) -> bool:
+        """Check whether a realm exists, caching positive results for REALM_CACHE_TTL seconds."""
+        expiry = _known_realms.get(realm_id)
+        if expiry is not None and expiry > time.monotonic():
+            return True
+        if DatabaseService.get_realm_by_id(db, realm_id) is None:
+            return False
+        _known_realms[realm_id] = time.monotonic() + REALM_CACHE_TTL
+        return True
 
     @staticmethod
     def get_all_realms(db: Session) -> List[Realm]:
         """Get all realms."""
         return db.query(Realm).all()
 
+    @staticmethod
+    def _principal_values(user_data: SCIMUserCreate, realm_id: str) -> Dict[str, Any]:
+        """Build column values for a new SCIMUser or SCIMIDP row."""
+        values = user_data.model_dump(mode='json')
+        values["user_id"] = generate_unique_id()
+        values["realm_id"] = realm_id
+        return values
+
     @staticmethod
     def create_scim_user(db: Session, user_data: SCIMUserCreate, realm_id: str) -> SCIMUser:
         """Create a new SCIM user."""
         # Verify realm exists
-        realm = DatabaseService.get_realm_by_id(db, realm_id)
-        if not realm:
+        if not DatabaseService.realm_exists(db, realm_id):
             raise ValueError(f"Realm {realm_id} not found")
 
         # Create user
-        user = SCIMUser(
-            user_id=generate_unique_id(),
-            realm_id=realm_id,
-            schemas=json.dumps(user_data.schemas),
-            userName=user_data.userName,
-            externalId=user_data.externalId,
-            firstName=user_data.firstName,
-            surName=user_data.surName,
-            displayName=user_data.displayName,
-            active=user_data.active,
-            emails=json.dumps([email.model_dump() for email in user_data.emails])
-        )
+        user = SCIMUser(**DatabaseService._principal_values(user_data, realm_id))
         db.add(user)
-        db.commit()
-        db.refresh(user)
+        try:
+            db.commit()
+        except IntegrityError:
+            # Username already taken in this realm (uq_realm_username)
+            db.rollback()
+            raise
         return user
 
+    @staticmethod
+    def bulk_create_scim_users(
+        db: Session,
+        users_data: List[SCIMUserCreate],
+        realm_id: str
+    ) -> List[SCIMUser]:
+        """
+        Create several SCIM users in one transaction.
+
+        Rows are written with a single multi-row INSERT ... RETURNING rather
+        than one INSERT and commit per user. Either all users are created or,
+        on any conflict, none are. Users are returned in input order.
+        """
+        if not DatabaseService.realm_exists(db, realm_id):
+            raise ValueError(f"Realm {realm_id} not found")
+        if not users_data:
+            return []
+
+        principal_values = DatabaseService._principal_values
+        payload = [principal_values(user_data, realm_id) for user_data in users_data]
+        try:
+            users = db.scalars(
+                insert(SCIMUser).returning(SCIMUser, sort_by_parameter_order=True), payload
+            ).all()
+            db.commit()
+        except IntegrityError:
+            db.rollback()
+            raise
+        return list(users)
+
     @staticmethod
     def get_scim_user_by_id(db: Session, user_id: str, realm_id: str) -> Optional[SCIMUser]:
         """Get SCIM user by user_id and realm_id."""
-        return db.query(SCIMUser).filter(
-            and_(SCIMUser.user_id == user_id, SCIMUser.realm_id == realm_id)
-        ).first()
+        stmt = lambda_stmt(lambda: select(SCIMUser).where(
+            SCIMUser.user_id == user_id, SCIMUser.realm_id == realm_id
+        ).limit(1))
+        return db.execute(stmt).scalars().first()
 
     @staticmethod
     def get_scim_user_by_username(db: Session, username: str, realm_id: str) -> Optional[SCIMUser]:
         """Get SCIM user by username and realm_id."""
-        return db.query(SCIMUser).filter(
-            and_(SCIMUser.userName == username, SCIMUser.realm_id == realm_id)
-        ).first()
+        stmt = lambda_stmt(lambda: select(SCIMUser).where(
+            SCIMUser.userName == username, SCIMUser.realm_id == realm_id
+        ).limit(1))
+        return db.execute(stmt).scalars().first()
 
     @staticmethod
     def get_scim_user_by_email(db: Session, email: str, realm_id: str) -> Optional[SCIMUser]:
         """Get SCIM user by email and realm_id."""
-        users = db.query(SCIMUser).filter(SCIMUser.realm_id == realm_id).all()
-        for user in users:
-            emails_data = json.loads(user.emails)
-            for email_obj in emails_data:
-                if email_obj.get('value') == email:
-                    return user
-        return None
+        dialect = db.get_bind().dialect.name
+        if dialect == "sqlite":
+            # Match inside the JSON array in SQL instead of loading the realm
+            email_items = func.json_each(SCIMUser.emails).table_valued("value")
+            email_match = (
+                select(1)
+                .select_from(email_items)
+                .where(func.json_extract(email_items.c.value, "$.value") == email)
+                .exists()
+            )
+        elif dialect == "postgresql":
+            email_match = cast(SCIMUser.emails, JSONB).contains([{"value": email}])
+        else:
+            users = db.query(SCIMUser).filter(SCIMUser.realm_id == realm_id).all()
+            for user in users:
+                for email_obj in user.emails:
+                    if email_obj.get('value') == email:
+                        return user
+            return None
+
+        return db.query(SCIMUser).filter(SCIMUser.realm_id == realm_id, email_match).first()
 
     @staticmethod
-    def get_scim_users(
-        db: Session, 
-        realm_id: str, 
-        start_index: int = 1, 
-        count: int = 100,
-        filter_query: Optional[str] = None
-    ) -> tuple[List[SCIMUser], int]:
-        """Get SCIM users with pagination and filtering."""
-        query = db.query(SCIMUser).filter(SCIMUser.realm_id == realm_id)
+    def _user_list_conditions(realm_id: str, filter_query: Optional[str]) -> list:
+        """Build the WHERE conditions shared by the user list queries."""
+        conditions = [SCIMUser.realm_id == realm_id]
         
         # Apply filter if provided
         if filter_query:
-            # Simple filter implementation - can be enhanced
-            query = query.filter(
-                or_(
-                    SCIMUser.userName.contains(filter_query),
-                    SCIMUser.displayName.contains(filter_query),
-                    SCIMUser.firstName.contains(filter_query),
-                    SCIMUser.surName.contains(filter_query)
-                )
-            )
+            conditions.append(_compile_filter(filter_query))
+        return conditions
+
+    @staticmethod
+    def list_scim_users_raw(
+        db: Session,
+        realm_id: str,
+        start_index: int = 1,
+        count: int = 100,
+        filter_query: Optional[str] = None
+    ) -> tuple[List[RowMapping], int]:
+        """
+        Get a page of SCIM users as plain column rows, without ORM objects.
+
+        emails and schemas are selected as their stored JSON text so they can
+        be embedded in the response with orjson.Fragment instead of being
+        parsed and re-encoded. See user_row_to_dict(). A count of 0 only
+        counts the matching users.
+        """
+        conditions = DatabaseService._user_list_conditions(realm_id, filter_query)
+        if count == 0:
+            # Only the total was asked for
+            return [], db.scalar(select(func.count(SCIMUser.id)).where(*conditions))
+
+        stmt = (
+            select(*USER_ROW_COLUMNS, func.count().over().label('total'))
+            .where(*conditions)
+            .offset(start_index - 1)
+            .limit(count)
+        )
+        rows = db.execute(stmt).mappings().all()
+        if rows:
+            return list(rows), rows[0]['total']
         
-        total_count = query.count()
-        users = query.offset(start_index - 1).limit(count).all()
-        return users, total_count
+        # A page past the end has no rows to carry the window total
+        if start_index > 1:
+            total_count = db.scalar(select(func.count(SCIMUser.id)).where(*conditions))
+            return [], total_count
+        return [], 0
+
+    @staticmethod
+    def list_scim_users_keyset(
+        db: Session,
+        realm_id: str,
+        cursor: Optional[str] = None,
+        count: int = 100,
+        filter_query: Optional[str] = None
+    ) -> tuple[List[RowMapping], int, Optional[str]]:
+        """
+        Get a page of SCIM users after an opaque cursor.
+
+        Pages are ordered by primary key and start with WHERE id > <last id>,
+        so the cost of a page does not grow with its depth the way OFFSET
+        does. Returns the rows (as list_scim_users_raw() does), the total
+        match count and the cursor for the next page, or None on the last page.
+
+        The total is counted on the first page only and carried in the cursor,
+        so later pages report the first page's total without a COUNT(*) over
+        the realm.
+
+        Raises:
+            ValueError: If the cursor is malformed.
+        """
+        conditions = DatabaseService._user_list_conditions(realm_id, filter_query)
+        page_conditions = list(conditions)
+        total_count = None
+        if cursor:
+            last_id, total_count = DatabaseService.decode_cursor(cursor)
+            page_conditions.append(SCIMUser.id > last_id)
+        if total_count is None:
+            total_count = db.scalar(select(func.count(SCIMUser.id)).where(*conditions))
+        if count == 0:
+            return [], total_count, None
+
+        # One extra row tells us whether another page follows
+        stmt = (
+            select(*USER_ROW_COLUMNS, SCIMUser.id)
+            .where(*page_conditions)
+            .order_by(SCIMUser.id)
+            .limit(count + 1)
+        )
+        rows = db.execute(stmt).mappings().all()
+        next_cursor = None
+        if len(rows) > count:
+            rows = rows[:count]
+            next_cursor = DatabaseService.encode_cursor(rows[-1]['id'], total_count)
+
+        return list(rows), total_count, next_cursor
+
+    @staticmethod
+    def encode_cursor(last_id: int, total_count: int) -> str:
+        """Encode the last row id of a page and the listing's total as an opaque cursor."""
+        return base64.urlsafe_b64encode(f"{last_id}.{total_count}".encode("ascii")).decode("ascii")
+
+    @staticmethod
+    def decode_cursor(cursor: str) -> tuple[int, Optional[int]]:
+        """
+        Decode a cursor produced by encode_cursor() into (last id, total).
+
+        Cursors issued before the total was carried decode with a total of None.
+        """
+        try:
+            last_id, _, total_count = base64.urlsafe_b64decode(cursor.encode("ascii")).partition(b".")
+            return int(last_id), int(total_count) if total_count else None
+        except ValueError:
+            raise ValueError(f"Invalid cursor '{cursor}'")
 
     @staticmethod
     def update_scim_user(
@@ -132,27 +371,22 @@ class DatabaseService:
         if not user:
             return None
         
-        # Update fields if provided
-        update_data = user_data.model_dump(exclude_unset=True)
+        # Update fields if provided. exclude_unset only picks which fields to
+        # change: emails are dumped in full so entries that omit primary still
+        # store it, as on create
+        update_data = user_data.model_dump(mode='json', exclude_unset=True, exclude={'emails'})
+        if user_data.emails is not None:
+            update_data['emails'] = [email.model_dump(mode='json') for email in user_data.emails]
         for field, value in update_data.items():
-            if field == 'emails' and value:
-                # Handle emails - convert to JSON regardless of input type
-                if isinstance(value, list) and len(value) > 0:
-                    if isinstance(value[0], dict):
-                        # Already dictionaries from API request
-                        setattr(user, field, json.dumps(value))
-                    else:
-                        # Pydantic EmailSchema objects
-                        setattr(user, field, json.dumps([email.model_dump() for email in value]))
-                else:
-                    setattr(user, field, json.dumps(value if value else []))
-            elif field == 'schemas' and value:
-                setattr(user, field, json.dumps(value))
-            elif value is not None:
+            if value is not None:
                 setattr(user, field, value)
 
-        db.commit()
-        db.refresh(user)
+        try:
+            db.commit()
+        except IntegrityError:
+            # New username already taken in this realm (uq_realm_username)
+            db.rollback()
+            raise
         return user
 
     @staticmethod
@@ -170,69 +404,89 @@ class DatabaseService:
     def create_scim_idp_user(db: Session, user_data: SCIMUserCreate, realm_id: str) -> SCIMIDP:
         """Create a new SCIM IDP user."""
         # Verify realm exists
-        realm = DatabaseService.get_realm_by_id(db, realm_id)
-        if not realm:
+        if not DatabaseService.realm_exists(db, realm_id):
             raise ValueError(f"Realm {realm_id} not found")
 
         # Create IDP user
-        user = SCIMIDP(
-            user_id=generate_unique_id(),
-            realm_id=realm_id,
-            schemas=json.dumps(user_data.schemas),
-            userName=user_data.userName,
-            externalId=user_data.externalId,
-            firstName=user_data.firstName,
-            surName=user_data.surName,
-            displayName=user_data.displayName,
-            active=user_data.active,
-            emails=json.dumps([email.model_dump() for email in user_data.emails])
-        )
+        user = SCIMIDP(**DatabaseService._principal_values(user_data, realm_id))
         db.add(user)
         db.commit()
-        db.refresh(user)
         return user
 
     @staticmethod
     def create_admin_user(db: Session, admin_data: AdminUserCreate) -> AdminUser:
         """Create a new admin user."""
-        hashed_password = pwd_context.hash(admin_data.password)
+        hashed_password = bcrypt.hashpw(
+            _bcrypt_secret(admin_data.password), bcrypt.gensalt(rounds=BCRYPT_ROUNDS)
+        ).decode("ascii")
         admin = AdminUser(
             username=admin_data.username,
             password_hash=hashed_password,
             email=admin_data.email
         )
         db.add(admin)
-        db.commit()
-        db.refresh(admin)
+        try:
+            db.commit()
+        except IntegrityError:
+            db.rollback()
+            raise
         return admin
 
     @staticmethod
     def get_admin_user(db: Session, username: str) -> Optional[AdminUser]:
         """Get admin user by username."""
-        return db.query(AdminUser).filter(AdminUser.username == username).first()
+        stmt = lambda_stmt(lambda: select(AdminUser).where(AdminUser.username == username).limit(1))
+        return db.execute(stmt).scalars().first()
 
     @staticmethod
     def verify_admin_password(password: str, hashed_password: str) -> bool:
         """Verify admin password."""
-        return pwd_context.verify(password, hashed_password)
+        try:
+            return bcrypt.checkpw(_bcrypt_secret(password), hashed_password.encode("ascii"))
+        except ValueError:
+            # Malformed or non-bcrypt hash
+            return False
 
     @staticmethod
     def user_to_dict(user: SCIMUser) -> Dict[str, Any]:
         """Convert SCIMUser to dictionary for response."""
         return {
             "id": user.user_id,
-            "schemas": json.loads(user.schemas),
+            "schemas": user.schemas,
             "userName": user.userName,
             "externalId": user.externalId,
             "firstName": user.firstName,
             "surName": user.surName,
             "displayName": user.displayName,
             "active": user.active,
-            "emails": json.loads(user.emails),
+            "emails": user.emails,
             "meta": {
                 "resourceType": "User",
-                "created": user.created_at.isoformat() if user.created_at else None,
-                "lastModified": user.updated_at.isoformat() if user.updated_at else None,
+                # datetimes are formatted natively by the orjson response class
+                "created": user.created_at,
+                "lastModified": user.updated_at,
                 "location": f"/scim/v2/Realms/{user.realm_id}/Users/{user.user_id}"
             }
         }
+
+    @staticmethod
+    def user_row_to_dict(row: RowMapping) -> Dict[str, Any]:
+        """Convert a list_scim_users_raw() row to a dictionary for response."""
+        return {
+            "id": row['user_id'],
+            # Already JSON text in the database; embedded without re-parsing
+            "schemas": orjson.Fragment(row['schemas']),
+            "userName": row['userName'],
+            "externalId": row['externalId'],
+            "firstName": row['firstName'],
+            "surName": row['surName'],
+            "displayName": row['displayName'],
+            "active": row['active'],
+            "emails": orjson.Fragment(row['emails']),
+            "meta": {
+                "resourceType": "User",
+                "created": row['created_at'],
+                "lastModified": row['updated_at'],
+                "location": f"/scim/v2/Realms/{row['realm_id']}/Users/{row['user_id']}"
+            }
+        }
@@ -4,6 +4,7 @@ Admin endpoints for realm and user management.
 
 from fastapi import APIRouter, Depends, HTTPException, status
 from sqlalchemy.orm import Session
+from sqlalchemy.exc import IntegrityError
 from typing import List
 import logging
 
@@ -15,8 +16,7 @@ from ..schemas import (
 from ..database_service import DatabaseService
 from ..auth_service import get_current_admin
 
-# Configure logging
-logging.basicConfig(level=logging.INFO)
+# Logging is configured once by the application entry point
 logger = logging.getLogger(__name__)
 
 router = APIRouter()
@@ -28,7 +28,7 @@ router = APIRouter()
     status_code=status.HTTP_201_CREATED,
     tags=["Admin - Realms"]
 )
-async def create_realm(
+def create_realm(
     realm_data: RealmCreate,
     db: Session = Depends(get_db),
     current_admin: str = Depends(get_current_admin)
@@ -44,14 +44,14 @@ async def create_realm(
     Returns:
         Created realm data
     """
-    logger.info(f"Creating realm '{realm_data.name}' by admin {current_admin}")
+    logger.info("Creating realm '%s' by admin %s", realm_data.name, current_admin)
     
     try:
         realm = DatabaseService.create_realm(db, realm_data)
-        logger.info(f"Successfully created realm {realm.realm_id}")
+        logger.info("Successfully created realm %s", realm.realm_id)
         return RealmResponse.model_validate(realm)
     except Exception as e:
-        logger.error(f"Error creating realm: {str(e)}")
+        logger.error("Error creating realm: %s", e)
         raise HTTPException(status_code=status.HTTP_500_INTERNAL_SERVER_ERROR, detail="Internal server error")
 
 
@@ -60,7 +60,7 @@ async def create_realm(
     response_model=List[RealmResponse],
     tags=["Admin - Realms"]
 )
-async def list_realms(
+def list_realms(
     db: Session = Depends(get_db),
     current_admin: str = Depends(get_current_admin)
 ) -> List[RealmResponse]:
@@ -74,18 +74,23 @@ async def list_realms(
     Returns:
         List of all realms
     """
-    logger.info(f"Listing realms by admin {current_admin}")
+    logger.info("Listing realms by admin %s", current_admin)
     
     realms = DatabaseService.get_all_realms(db)
     return [RealmResponse.model_validate(realm) for realm in realms]
 
 
+@router.head(
+    "/admin/realms/{realm_id}",
+    operation_id="head_realm",
+    include_in_schema=False
+)
 @router.get(
     "/admin/realms/{realm_id}",
     response_model=RealmResponse,
     tags=["Admin - Realms"]
 )
-async def get_realm(
+def get_realm(
     realm_id: str,
     db: Session = Depends(get_db),
     current_admin: str = Depends(get_current_admin)
@@ -93,6 +98,8 @@ async def get_realm(
     """
     Get a specific realm by ID.
     
+    HEAD is accepted so clients can check that a realm exists without a body.
+    
     Args:
         realm_id: Unique realm identifier
         db: Database session
@@ -101,7 +108,7 @@ async def get_realm(
     Returns:
         Realm data
     """
-    logger.info(f"Getting realm {realm_id} by admin {current_admin}")
+    logger.info("Getting realm %s by admin %s", realm_id, current_admin)
     
     realm = DatabaseService.get_realm_by_id(db, realm_id)
     if not realm:
@@ -119,7 +126,7 @@ async def get_realm(
     status_code=status.HTTP_201_CREATED,
     tags=["Admin - Users"]
 )
-async def create_admin_user(
+def create_admin_user(
     admin_data: AdminUserCreate,
     db: Session = Depends(get_db),
     current_admin: str = Depends(get_current_admin)
@@ -135,10 +142,10 @@ async def create_admin_user(
     Returns:
         Created admin user data
     """
-    logger.info(f"Creating admin user '{admin_data.username}' by admin {current_admin}")
+    logger.info("Creating admin user '%s' by admin %s", admin_data.username, current_admin)
     
     try:
-        # Check if admin already exists
+        # Check if admin already exists (cheap check before paying for bcrypt)
         existing_admin = DatabaseService.get_admin_user(db, admin_data.username)
         if existing_admin:
             raise HTTPException(
@@ -147,13 +154,19 @@ async def create_admin_user(
             )
         
         admin_user = DatabaseService.create_admin_user(db, admin_data)
-        logger.info(f"Successfully created admin user {admin_user.username}")
+        logger.info("Successfully created admin user %s", admin_user.username)
         return AdminUserResponse.model_validate(admin_user)
         
     except HTTPException:
         raise
+    except IntegrityError:
+        # Created concurrently after the existence check
+        raise HTTPException(
+            status_code=status.HTTP_409_CONFLICT,
+            detail=f"Admin user with username '{admin_data.username}' already exists"
+        )
     except Exception as e:
-        logger.error(f"Error creating admin user: {str(e)}")
+        logger.error("Error creating admin user: %s", e)
         raise HTTPException(status_code=status.HTTP_500_INTERNAL_SERVER_ERROR, detail="Internal server error")
 
 
@@ -162,7 +175,7 @@ async def create_admin_user(
     response_model=SuccessResponse,
     tags=["Admin - Health"]
 )
-async def health_check(
+def health_check(
     db: Session = Depends(get_db),
     current_admin: str = Depends(get_current_admin)
 ) -> SuccessResponse:
@@ -176,7 +189,7 @@ async def health_check(
     Returns:
         Health status
     """
-    logger.info(f"Health check by admin {current_admin}")
+    logger.info("Health check by admin %s", current_admin)
     
     return SuccessResponse(
         message="SCIM endpoints are healthy",
@@ -3,25 +3,33 @@ SCIM 2.0 Endpoints for user provisioning.
 """
 
 from fastapi import APIRouter, Depends, HTTPException, status, Query
-from fastapi.responses import JSONResponse
 from sqlalchemy.orm import Session
-from typing import Optional, List
+from sqlalchemy.exc import IntegrityError
+from pydantic import ValidationError
+from typing import Optional, List, Dict, Any
 import logging
 
 from ..models import get_db
 from ..schemas import (
     SCIMUserCreate, SCIMUserUpdate, SCIMUserResponse, SCIMUserListResponse,
-    ErrorResponse, SuccessResponse
+    BulkRequest, BulkOperation, BulkResponse,
+    LIST_RESPONSE_SCHEMA, BULK_RESPONSE_SCHEMA, ERROR_SCHEMA
 )
 from ..database_service import DatabaseService
+from ..responses import ORJSONResponse
 from ..auth_service import get_current_admin
 
-# Configure logging
-logging.basicConfig(level=logging.INFO)
+# Logging is configured once by the application entry point
 logger = logging.getLogger(__name__)
 
 router = APIRouter()
 
+# Resource path of users within bulk operations
+BULK_USERS_PATH = "/Users"
+
+# Attributes returned regardless of the attributes parameter
+ALWAYS_RETURNED_ATTRIBUTES = ("schemas", "id")
+
 
 @router.post(
     "/scim/v2/Realms/{realm_id}/Users",
@@ -29,12 +37,12 @@ router = APIRouter()
     status_code=status.HTTP_201_CREATED,
     tags=["SCIM Users"]
 )
-async def create_user(
+def create_user(
     realm_id: str,
     user_data: SCIMUserCreate,
     db: Session = Depends(get_db),
     current_admin: str = Depends(get_current_admin)
-) -> SCIMUserResponse:
+) -> ORJSONResponse:
     """
     Create a new SCIM user in the specified realm.
     
@@ -48,45 +56,49 @@ async def create_user(
         Created user data with SCIM response format
     """
     try:
-        logger.info(f"Creating user {user_data.userName} in realm {realm_id} by admin {current_admin}")
-        
-        # Check if user already exists
-        existing_user = DatabaseService.get_scim_user_by_username(db, user_data.userName, realm_id)
-        if existing_user:
-            raise HTTPException(
-                status_code=status.HTTP_409_CONFLICT,
-                detail=f"User with username '{user_data.userName}' already exists in realm '{realm_id}'"
-            )
+        logger.info("Creating user %s in realm %s by admin %s", user_data.userName, realm_id, current_admin)
         
-        # Create user
+        # Create user; the unique (realm_id, userName) index rejects duplicates
         user = DatabaseService.create_scim_user(db, user_data, realm_id)
         user_dict = DatabaseService.user_to_dict(user)
         
-        logger.info(f"Successfully created user {user.userName} with ID {user.user_id}")
-        return SCIMUserResponse(**user_dict)
+        logger.info("Successfully created user %s with ID %s", user.userName, user.user_id)
+        return ORJSONResponse(content=user_dict, status_code=status.HTTP_201_CREATED)
         
+    except IntegrityError:
+        raise HTTPException(
+            status_code=status.HTTP_409_CONFLICT,
+            detail=f"User with username '{user_data.userName}' already exists in realm '{realm_id}'"
+        )
     except ValueError as e:
-        logger.error(f"ValueError creating user: {str(e)}")
+        logger.error("ValueError creating user: %s", e)
         raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=str(e))
     except Exception as e:
-        logger.error(f"Error creating user: {str(e)}")
+        logger.error("Error creating user: %s", e)
         raise HTTPException(status_code=status.HTTP_500_INTERNAL_SERVER_ERROR, detail="Internal server error")
 
 
+@router.head(
+    "/scim/v2/Realms/{realm_id}/Users/{user_id}",
+    operation_id="head_user",
+    include_in_schema=False
+)
 @router.get(
     "/scim/v2/Realms/{realm_id}/Users/{user_id}",
     response_model=SCIMUserResponse,
     tags=["SCIM Users"]
 )
-async def get_user(
+def get_user(
     realm_id: str,
     user_id: str,
     db: Session = Depends(get_db),
     current_admin: str = Depends(get_current_admin)
-) -> SCIMUserResponse:
+) -> ORJSONResponse:
     """
     Get a specific SCIM user by ID.
     
+    HEAD is accepted so clients can check that a user exists without a body.
+    
     Args:
         realm_id: Unique realm identifier
         user_id: Unique user identifier
@@ -96,7 +108,7 @@ async def get_user(
     Returns:
         User data with SCIM response format
     """
-    logger.info(f"Getting user {user_id} from realm {realm_id} by admin {current_admin}")
+    logger.info("Getting user %s from realm %s by admin %s", user_id, realm_id, current_admin)
     
     user = DatabaseService.get_scim_user_by_id(db, user_id, realm_id)
     if not user:
@@ -105,8 +117,9 @@ async def get_user(
             detail=f"User with ID '{user_id}' not found in realm '{realm_id}'"
         )
     
+    # Trusted database row; response_model documents the shape without re-validating it
     user_dict = DatabaseService.user_to_dict(user)
-    return SCIMUserResponse(**user_dict)
+    return ORJSONResponse(content=user_dict)
 
 
 @router.get(
@@ -114,45 +127,86 @@ async def get_user(
     response_model=SCIMUserListResponse,
     tags=["SCIM Users"]
 )
-async def list_users(
+def list_users(
     realm_id: str,
     startIndex: int = Query(1, ge=1, description="Start index for pagination"),
-    count: int = Query(100, ge=1, le=1000, description="Number of users to return"),
+    count: int = Query(100, ge=0, le=1000, description="Number of users to return; 0 returns only totalResults"),
     filter: Optional[str] = Query(None, description="Filter query"),
+    cursor: Optional[str] = Query(
+        None,
+        description="Cursor pagination: empty for the first page, then the previous page's nextCursor"
+    ),
     db: Session = Depends(get_db),
     current_admin: str = Depends(get_current_admin)
-) -> SCIMUserListResponse:
+) -> ORJSONResponse:
     """
     List SCIM users with pagination and filtering.
     
+    Pages are addressed by startIndex, or by cursor when one is given.
+    Cursor pages cost the same at any depth and carry a nextCursor until
+    the last page.
+    
     Args:
         realm_id: Unique realm identifier
         startIndex: Start index for pagination (1-based)
-        count: Number of users to return
+        count: Number of users to return (0 for totalResults only)
         filter: Optional filter query
+        cursor: Optional pagination cursor; empty string for the first page
         db: Database session
         current_admin: Authenticated admin username
     
     Returns:
         List of users with pagination metadata
     """
-    logger.info(f"Listing users from realm {realm_id} by admin {current_admin}")
+    logger.info("Listing users from realm %s by admin %s", realm_id, current_admin)
     
-    users, total_count = DatabaseService.get_scim_users(
-        db, realm_id, startIndex, count, filter
-    )
+    next_cursor = None
+    if cursor is None:
+        rows, total_count = DatabaseService.list_scim_users_raw(
+            db, realm_id, startIndex, count, filter
+        )
+    else:
+        try:
+            rows, total_count, next_cursor = DatabaseService.list_scim_users_keyset(
+                db, realm_id, cursor, count, filter
+            )
+        except ValueError as e:
+            raise HTTPException(
+                status_code=status.HTTP_400_BAD_REQUEST,
+                detail=str(e)
+            )
     
-    user_resources = [
-        SCIMUserResponse(**DatabaseService.user_to_dict(user)) 
-        for user in users
-    ]
+    # Plain column rows from our own database: no ORM objects, no per-item
+    # response model validation and no re-parsing of the JSON columns
+    user_row_to_dict = DatabaseService.user_row_to_dict
+    user_resources = [user_row_to_dict(row) for row in rows]
     
-    return SCIMUserListResponse(
-        totalResults=total_count,
-        startIndex=startIndex,
-        itemsPerPage=len(user_resources),
-        Resources=user_resources
-    )
+    response = {
+        "schemas": [LIST_RESPONSE_SCHEMA],
+        "totalResults": total_count
+    }
+    if cursor is None:
+        response["startIndex"] = startIndex
+    response["itemsPerPage"] = len(user_resources)
+    response["Resources"] = user_resources
+    if next_cursor is not None:
+        response["nextCursor"] = next_cursor
+    return ORJSONResponse(content=response)
+
+
+def _project_attributes(resource: Dict[str, Any], attributes: Optional[str]) -> Dict[str, Any]:
+    """
+    Keep only the requested top-level attributes of a resource.
+
+    attributes is a comma-separated SCIM attribute list; names are matched
+    case-insensitively and a sub-attribute such as emails.value selects its
+    whole parent attribute.
+    """
+    if not attributes:
+        return resource
+    requested = {name.strip().split(".", 1)[0].lower() for name in attributes.split(",")}
+    requested.update(ALWAYS_RETURNED_ATTRIBUTES)
+    return {key: value for key, value in resource.items() if key.lower() in requested}
 
 
 @router.put(
@@ -160,13 +214,17 @@ async def list_users(
     response_model=SCIMUserResponse,
     tags=["SCIM Users"]
 )
-async def update_user(
+def update_user(
     realm_id: str,
     user_id: str,
     user_data: SCIMUserUpdate,
+    attributes: Optional[str] = Query(
+        None,
+        description="Comma-separated attributes to return; id and schemas are always included"
+    ),
     db: Session = Depends(get_db),
     current_admin: str = Depends(get_current_admin)
-) -> SCIMUserResponse:
+) -> ORJSONResponse:
     """
     Update a SCIM user.
     
@@ -174,23 +232,30 @@ async def update_user(
         realm_id: Unique realm identifier
         user_id: Unique user identifier
         user_data: Updated user data
+        attributes: Optional attributes to limit the response to
         db: Database session
         current_admin: Authenticated admin username
     
     Returns:
         Updated user data with SCIM response format
     """
-    logger.info(f"Updating user {user_id} in realm {realm_id} by admin {current_admin}")
+    logger.info("Updating user %s in realm %s by admin %s", user_id, realm_id, current_admin)
     
-    user = DatabaseService.update_scim_user(db, user_id, realm_id, user_data)
+    try:
+        user = DatabaseService.update_scim_user(db, user_id, realm_id, user_data)
+    except IntegrityError:
+        raise HTTPException(
+            status_code=status.HTTP_409_CONFLICT,
+            detail=f"User with username '{user_data.userName}' already exists in realm '{realm_id}'"
+        )
     if not user:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
             detail=f"User with ID '{user_id}' not found in realm '{realm_id}'"
         )
     
-    user_dict = DatabaseService.user_to_dict(user)
-    return SCIMUserResponse(**user_dict)
+    user_dict = _project_attributes(DatabaseService.user_to_dict(user), attributes)
+    return ORJSONResponse(content=user_dict)
 
 
 @router.delete(
@@ -198,7 +263,7 @@ async def update_user(
     status_code=status.HTTP_204_NO_CONTENT,
     tags=["SCIM Users"]
 )
-async def delete_user(
+def delete_user(
     realm_id: str,
     user_id: str,
     db: Session = Depends(get_db),
@@ -213,7 +278,7 @@ async def delete_user(
         db: Database session
         current_admin: Authenticated admin username
     """
-    logger.info(f"Deleting user {user_id} from realm {realm_id} by admin {current_admin}")
+    logger.info("Deleting user %s from realm %s by admin %s", user_id, realm_id, current_admin)
     
     deleted = DatabaseService.delete_scim_user(db, user_id, realm_id)
     if not deleted:
@@ -228,12 +293,12 @@ async def delete_user(
     response_model=SCIMUserResponse,
     tags=["SCIM Users"]
 )
-async def get_user_by_username(
+def get_user_by_username(
     realm_id: str,
     username: str,
     db: Session = Depends(get_db),
     current_admin: str = Depends(get_current_admin)
-) -> SCIMUserResponse:
+) -> ORJSONResponse:
     """
     Get a SCIM user by username.
     
@@ -246,7 +311,7 @@ async def get_user_by_username(
     Returns:
         User data with SCIM response format
     """
-    logger.info(f"Getting user by username {username} from realm {realm_id} by admin {current_admin}")
+    logger.info("Getting user by username %s from realm %s by admin %s", username, realm_id, current_admin)
     
     user = DatabaseService.get_scim_user_by_username(db, username, realm_id)
     if not user:
@@ -256,7 +321,7 @@ async def get_user_by_username(
         )
     
     user_dict = DatabaseService.user_to_dict(user)
-    return SCIMUserResponse(**user_dict)
+    return ORJSONResponse(content=user_dict)
 
 
 @router.get(
@@ -264,12 +329,12 @@ async def get_user_by_username(
     response_model=SCIMUserResponse,
     tags=["SCIM Users"]
 )
-async def get_user_by_email(
+def get_user_by_email(
     realm_id: str,
     email: str,
     db: Session = Depends(get_db),
     current_admin: str = Depends(get_current_admin)
-) -> SCIMUserResponse:
+) -> ORJSONResponse:
     """
     Get a SCIM user by email address.
     
@@ -282,7 +347,7 @@ async def get_user_by_email(
     Returns:
         User data with SCIM response format
     """
-    logger.info(f"Getting user by email {email} from realm {realm_id} by admin {current_admin}")
+    logger.info("Getting user by email %s from realm %s by admin %s", email, realm_id, current_admin)
     
     user = DatabaseService.get_scim_user_by_email(db, email, realm_id)
     if not user:
@@ -292,4 +357,174 @@ async def get_user_by_email(
         )
     
     user_dict = DatabaseService.user_to_dict(user)
-    return SCIMUserResponse(**user_dict)
+    return ORJSONResponse(content=user_dict)
+
+
+def _user_location(realm_id: str, user_id: str) -> str:
+    """Build the location of a user resource."""
+    return f"/scim/v2/Realms/{realm_id}/Users/{user_id}"
+
+
+def _bulk_result(
+    operation: BulkOperation,
+    status_code: int,
+    location: Optional[str] = None,
+    detail: Optional[str] = None
+) -> Dict[str, Any]:
+    """Build the result entry of a bulk operation, with a SCIM error when detail is given."""
+    result: Dict[str, Any] = {"method": operation.method, "status": str(status_code)}
+    if operation.bulkId is not None:
+        result["bulkId"] = operation.bulkId
+    if location is not None:
+        result["location"] = location
+    if detail is not None:
+        result["response"] = {"schemas": [ERROR_SCHEMA], "detail": detail, "status": str(status_code)}
+    return result
+
+
+def _validation_detail(error: ValidationError) -> str:
+    """Summarise a validation error for a bulk operation result."""
+    return "; ".join(
+        f"{'.'.join(str(part) for part in err['loc'])}: {err['msg']}" if err["loc"] else err["msg"]
+        for err in error.errors()
+    )
+
+
+def _is_bulk_user_create(operation: BulkOperation) -> bool:
+    """Check whether a bulk operation creates a user."""
+    return operation.method == "POST" and operation.path == BULK_USERS_PATH
+
+
+def _bulk_create_users(
+    db: Session,
+    realm_id: str,
+    operations: List[BulkOperation]
+) -> Optional[List[Dict[str, Any]]]:
+    """
+    Create the users of consecutive POST operations with one INSERT.
+
+    Returns None when any operation is invalid or conflicts, in which case
+    nothing was written and the operations must be processed one by one.
+    """
+    try:
+        users_data = [SCIMUserCreate.model_validate(op.data or {}) for op in operations]
+        users = DatabaseService.bulk_create_scim_users(db, users_data, realm_id)
+    except (ValidationError, IntegrityError):
+        return None
+
+    return [
+        _bulk_result(op, status.HTTP_201_CREATED, location=_user_location(realm_id, user.user_id))
+        for op, user in zip(operations, users)
+    ]
+
+
+def _process_bulk_operation(db: Session, realm_id: str, operation: BulkOperation) -> Dict[str, Any]:
+    """Apply a single bulk operation and return its result entry."""
+    if _is_bulk_user_create(operation):
+        try:
+            user_data = SCIMUserCreate.model_validate(operation.data or {})
+            user = DatabaseService.create_scim_user(db, user_data, realm_id)
+        except ValidationError as e:
+            return _bulk_result(operation, status.HTTP_400_BAD_REQUEST, detail=_validation_detail(e))
+        except IntegrityError:
+            return _bulk_result(
+                operation, status.HTTP_409_CONFLICT,
+                detail=f"User with username '{user_data.userName}' already exists in realm '{realm_id}'"
+            )
+        return _bulk_result(operation, status.HTTP_201_CREATED, location=_user_location(realm_id, user.user_id))
+
+    prefix = BULK_USERS_PATH + "/"
+    user_id = operation.path[len(prefix):] if operation.path.startswith(prefix) else ""
+    if operation.method == "POST" or not user_id or "/" in user_id:
+        return _bulk_result(
+            operation, status.HTTP_400_BAD_REQUEST,
+            detail=f"Unsupported path '{operation.path}' for method {operation.method}"
+        )
+
+    location = _user_location(realm_id, user_id)
+    not_found = f"User with ID '{user_id}' not found in realm '{realm_id}'"
+    if operation.method == "DELETE":
+        if not DatabaseService.delete_scim_user(db, user_id, realm_id):
+            return _bulk_result(operation, status.HTTP_404_NOT_FOUND, location=location, detail=not_found)
+        return _bulk_result(operation, status.HTTP_204_NO_CONTENT, location=location)
+
+    try:
+        user_data = SCIMUserUpdate.model_validate(operation.data or {})
+        user = DatabaseService.update_scim_user(db, user_id, realm_id, user_data)
+    except ValidationError as e:
+        return _bulk_result(operation, status.HTTP_400_BAD_REQUEST, location=location, detail=_validation_detail(e))
+    except IntegrityError:
+        return _bulk_result(
+            operation, status.HTTP_409_CONFLICT, location=location,
+            detail=f"User with username '{user_data.userName}' already exists in realm '{realm_id}'"
+        )
+    if not user:
+        return _bulk_result(operation, status.HTTP_404_NOT_FOUND, location=location, detail=not_found)
+    return _bulk_result(operation, status.HTTP_200_OK, location=location)
+
+
+@router.post(
+    "/scim/v2/Realms/{realm_id}/Bulk",
+    response_model=BulkResponse,
+    tags=["SCIM Users"]
+)
+def bulk_users(
+    realm_id: str,
+    bulk_request: BulkRequest,
+    db: Session = Depends(get_db),
+    current_admin: str = Depends(get_current_admin)
+) -> ORJSONResponse:
+    """
+    Apply several user operations in one request (SCIM 2.0 Bulk).
+
+    Operations run in order. Consecutive user creations are written with a
+    single INSERT; if any of them fails they are retried one by one so that
+    each gets its own result. Processing stops once failOnErrors operations
+    have failed. bulkId references inside operation data are not supported.
+
+    Args:
+        realm_id: Unique realm identifier
+        bulk_request: Bulk operations following SCIM 2.0 schema
+        db: Database session
+        current_admin: Authenticated admin username
+
+    Returns:
+        Result of each processed operation with SCIM bulk response format
+    """
+    operations = bulk_request.Operations
+    logger.info("Processing %d bulk operations in realm %s by admin %s", len(operations), realm_id, current_admin)
+
+    if not DatabaseService.realm_exists(db, realm_id):
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail=f"Realm with ID '{realm_id}' not found"
+        )
+
+    results: List[Dict[str, Any]] = []
+    errors = 0
+    index = 0
+    while index < len(operations):
+        # Group a run of user creations so it can be inserted at once
+        end = index + 1
+        if _is_bulk_user_create(operations[index]):
+            while end < len(operations) and _is_bulk_user_create(operations[end]):
+                end += 1
+        run = operations[index:end]
+        index = end
+
+        created = _bulk_create_users(db, realm_id, run) if len(run) > 1 else None
+        if created is not None:
+            results.extend(created)
+            continue
+
+        for operation in run:
+            result = _process_bulk_operation(db, realm_id, operation)
+            results.append(result)
+            if "response" in result:
+                errors += 1
+                if bulk_request.failOnErrors and errors >= bulk_request.failOnErrors:
+                    index = len(operations)
+                    break
+
+    logger.info("Processed %d bulk operations in realm %s with %d errors", len(results), realm_id, errors)
+    return ORJSONResponse(content={"schemas": [BULK_RESPONSE_SCHEMA], "Operations": results})
@@ -10,8 +10,6 @@ from .models import create_tables, SessionLocal, generate_realm_id
 from .database_service import DatabaseService
 from .schemas import RealmCreate, AdminUserCreate
 
-# Configure logging
-logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
 
@@ -39,9 +37,9 @@ def init_database() -> None:
             if not any(realm.name == realm_data["name"] for realm in existing_realms):
                 realm_create = RealmCreate(**realm_data)
                 realm = DatabaseService.create_realm(db, realm_create)
-                logger.info(f"Created realm: {realm.name} with ID: {realm.realm_id}")
+                logger.info("Created realm: %s with ID: %s", realm.name, realm.realm_id)
             else:
-                logger.info(f"Realm '{realm_data['name']}' already exists, skipping creation")
+                logger.info("Realm '%s' already exists, skipping creation", realm_data['name'])
           # Create default admin user if not exists
         admin_username = "admin"
         existing_admin = DatabaseService.get_admin_user(db, admin_username)
@@ -53,13 +51,13 @@ def init_database() -> None:
                 email="admin@example.com"
             )
             admin_user = DatabaseService.create_admin_user(db, admin_create)
-            logger.info(f"Created default admin user: {admin_user.username}")
+            logger.info("Created default admin user: %s", admin_user.username)
             logger.warning("Default admin password is 'admin123' - Change this in production!")
         else:
             logger.info("Default admin user already exists, skipping creation")
             
     except Exception as e:
-        logger.error(f"Error initializing database: {str(e)}")
+        logger.error("Error initializing database: %s", e)
         db.rollback()
         raise
     finally:
@@ -69,4 +67,6 @@ def init_database() -> None:
 
 
 if __name__ == "__main__":
+    # Configure logging only when run as a script; importers own their setup
+    logging.basicConfig(level=logging.INFO)
     init_database()
\ No newline at end of file
@@ -0,0 +1,96 @@
+"""
+ASGI middleware for SCIM 2.0 endpoints.
+"""
+
+from starlette.datastructures import MutableHeaders
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+import zlib
+
+from .responses import ORJSONResponse
+
+# Largest gzip request body accepted, both as sent and after decompression
+# (guards against oversized uploads and zip bombs)
+MAX_DECOMPRESSED_BODY_BYTES = 10 * 1024 * 1024
+
+
+class GZipRequestMiddleware:
+    """
+    Transparently decompress request bodies sent with Content-Encoding: gzip.
+
+    Large SCIM payloads (bulk or multi-email users) compress well, so clients
+    may gzip them. Handlers always see the plain body; requests without the
+    header pass through untouched.
+    """
+
+    def __init__(self, app: ASGIApp, max_body_size: int = MAX_DECOMPRESSED_BODY_BYTES) -> None:
+        self.app = app
+        self.max_body_size = max_body_size
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        headers = MutableHeaders(scope=scope)
+        if headers.get("content-encoding", "").lower() != "gzip":
+            await self.app(scope, receive, send)
+            return
+
+        # Decompress each chunk as it arrives so neither the compressed nor the
+        # decompressed body is ever buffered beyond max_body_size
+        decompressor = zlib.decompressobj(16 + zlib.MAX_WBITS)
+        body = bytearray()
+        received = 0
+        more_body = True
+        try:
+            while more_body:
+                message = await receive()
+                if message["type"] == "http.disconnect":
+                    return
+                chunk = message.get("body", b"")
+                more_body = message.get("more_body", False)
+                received += len(chunk)
+                if received > self.max_body_size:
+                    await self._error(413, "Request body too large", scope, receive, send)
+                    return
+                if decompressor.eof:
+                    # Trailing bytes after the gzip stream are ignored
+                    continue
+                body.extend(decompressor.decompress(chunk, self.max_body_size - len(body) + 1))
+                if len(body) > self.max_body_size:
+                    await self._error(413, "Decompressed request body too large", scope, receive, send)
+                    return
+            if not decompressor.eof:
+                raise zlib.error("truncated gzip stream")
+        except zlib.error:
+            await self._error(400, "Invalid gzip request body", scope, receive, send)
+            return
+        body = bytes(body)
+
+        # Present the decompressed body to the application as a plain request
+        del headers["content-encoding"]
+        headers["content-length"] = str(len(body))
+
+        body_sent = False
+
+        async def receive_body() -> Message:
+            nonlocal body_sent
+            if body_sent:
+                return await receive()
+            body_sent = True
+            return {"type": "http.request", "body": body, "more_body": False}
+
+        await self.app(scope, receive_body, send)
+
+    @staticmethod
+    async def _error(status_code: int, detail: str, scope: Scope, receive: Receive, send: Send) -> None:
+        """Send a SCIM error response."""
+        response = ORJSONResponse(
+            status_code=status_code,
+            content={
+                "schemas": ["urn:ietf:params:scim:api:messages:2.0:Error"],
+                "detail": detail,
+                "status": str(status_code)
+            }
+        )
+        await response(scope, receive, send)
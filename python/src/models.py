@@ -3,15 +3,23 @@ Database models for SCIM 2.0 endpoints using SQLAlchemy.
 """
 
 from sqlalchemy import (
-    Column, Integer, String, Boolean, Text, DateTime, 
-    ForeignKey, create_engine, Index
+    Column, Integer, String, Boolean, Text, DateTime, JSON,
+    ForeignKey, MetaData, Table, create_engine, event, Index
 )
 from sqlalchemy.ext.declarative import declarative_base
-from sqlalchemy.orm import sessionmaker, relationship
+from sqlalchemy.orm import Mapped, sessionmaker, relationship
+from sqlalchemy.exc import SQLAlchemyError
+from sqlalchemy.pool import StaticPool
 from sqlalchemy.sql import func
-from typing import Optional
+from typing import Optional, Dict, Any
+import logging
+import os
+import secrets
+import time
 import uuid
-import json
+import orjson
+
+logger = logging.getLogger(__name__)
 
 Base = declarative_base()
 
@@ -19,6 +27,8 @@ Base = declarative_base()
 class Realm(Base):
     """Table to store realm information for SCIM endpoints."""
     __tablename__ = 'realms'
+    # Fetch server-generated timestamps via RETURNING instead of a refresh SELECT
+    __mapper_args__ = {"eager_defaults": True}
     
     id: int = Column(Integer, primary_key=True, autoincrement=True)
     realm_id: str = Column(String(50), unique=True, nullable=False, index=True)
@@ -26,67 +36,65 @@ class Realm(Base):
     description: Optional[str] = Column(Text)
     created_at = Column(DateTime, server_default=func.now())
     
-    # Relationships
-    scim_users = relationship("SCIMUser", back_populates="realm", cascade="all, delete-orphan")
-    scim_idps = relationship("SCIMIDP", back_populates="realm", cascade="all, delete-orphan")
+    # Relationships. A realm can hold many users, so collections are never
+    # loaded implicitly; callers that need them must opt in with selectinload().
+    scim_users = relationship(
+        "SCIMUser", back_populates="realm", cascade="all, delete-orphan", lazy="raise"
+    )
+    scim_idps = relationship(
+        "SCIMIDP", back_populates="realm", cascade="all, delete-orphan", lazy="raise"
+    )
 
 
-class SCIMUser(Base):
-    """SCIM User table following SCIM 2.0 core schema."""
-    __tablename__ = 'scim_users'
+class SCIMPrincipalMixin:
+    """
+    Columns shared by SCIM users and identity provider users.
+
+    Declarative copies these columns onto each table. Mixin columns must be
+    annotated with Mapped[] rather than the plain types used on the tables.
+    """
+    # Fetch server-generated timestamps via RETURNING instead of a refresh SELECT
+    __mapper_args__ = {"eager_defaults": True}
     
-    id: int = Column(Integer, primary_key=True, autoincrement=True)
-    user_id: str = Column(String(50), unique=True, nullable=False, index=True)
-    realm_id: str = Column(String(50), ForeignKey('realms.realm_id'), nullable=False)
+    id: Mapped[int] = Column(Integer, primary_key=True, autoincrement=True)
+    user_id: Mapped[str] = Column(String(50), unique=True, nullable=False, index=True)
+    realm_id: Mapped[str] = Column(String(50), ForeignKey('realms.realm_id'), nullable=False)
     
     # SCIM Core Schema fields
-    schemas: str = Column(Text, nullable=False)  # JSON string
-    userName: str = Column(String(100), nullable=False, index=True)
-    externalId: Optional[str] = Column(String(100), index=True)
-    firstName: str = Column(String(100), nullable=False)
-    surName: str = Column(String(100), nullable=False)
-    displayName: str = Column(String(200), nullable=False)
-    active: bool = Column(Boolean, default=True, nullable=False)
-    emails: str = Column(Text, nullable=False)  # JSON string
+    schemas: Mapped[list[str]] = Column(JSON, nullable=False)
+    userName: Mapped[str] = Column(String(100), nullable=False)
+    externalId: Mapped[Optional[str]] = Column(String(100))
+    firstName: Mapped[str] = Column(String(100), nullable=False)
+    surName: Mapped[str] = Column(String(100), nullable=False)
+    displayName: Mapped[str] = Column(String(200), nullable=False)
+    active: Mapped[bool] = Column(Boolean, default=True, nullable=False)
+    emails: Mapped[list[dict[str, Any]]] = Column(JSON, nullable=False)
     
     # Timestamps
     created_at = Column(DateTime, server_default=func.now())
     updated_at = Column(DateTime, server_default=func.now(), onupdate=func.now())
+
+
+class SCIMUser(SCIMPrincipalMixin, Base):
+    """SCIM User table following SCIM 2.0 core schema."""
+    __tablename__ = 'scim_users'
     
     # Relationships
-    realm = relationship("Realm", back_populates="scim_users")
+    realm = relationship("Realm", back_populates="scim_users", lazy="raise")
     
-    # Composite indexes for better performance
+    # Composite indexes for better performance; usernames are unique per realm
     __table_args__ = (
-        Index('idx_realm_username', 'realm_id', 'userName'),
+        Index('uq_realm_username', 'realm_id', 'userName', unique=True),
         Index('idx_realm_external', 'realm_id', 'externalId'),
     )
 
 
-class SCIMIDP(Base):
+class SCIMIDP(SCIMPrincipalMixin, Base):
     """SCIM IDP table for identity provider users."""
     __tablename__ = 'scim_idp'
     
-    id: int = Column(Integer, primary_key=True, autoincrement=True)
-    user_id: str = Column(String(50), unique=True, nullable=False, index=True)
-    realm_id: str = Column(String(50), ForeignKey('realms.realm_id'), nullable=False)
-    
-    # SCIM Core Schema fields
-    schemas: str = Column(Text, nullable=False)  # JSON string
-    userName: str = Column(String(100), nullable=False, index=True)
-    externalId: Optional[str] = Column(String(100), index=True)
-    firstName: str = Column(String(100), nullable=False)
-    surName: str = Column(String(100), nullable=False)
-    displayName: str = Column(String(200), nullable=False)
-    active: bool = Column(Boolean, default=True, nullable=False)
-    emails: str = Column(Text, nullable=False)  # JSON string
-    
-    # Timestamps
-    created_at = Column(DateTime, server_default=func.now())
-    updated_at = Column(DateTime, server_default=func.now(), onupdate=func.now())
-    
     # Relationships
-    realm = relationship("Realm", back_populates="scim_idps")
+    realm = relationship("Realm", back_populates="scim_idps", lazy="raise")
     
     # Composite indexes for better performance
     __table_args__ = (
@@ -98,6 +106,8 @@ class SCIMIDP(Base):
 class AdminUser(Base):
     """Authentication table for SCIM endpoint administrators."""
     __tablename__ = 'admin_users'
+    # Fetch server-generated timestamps via RETURNING instead of a refresh SELECT
+    __mapper_args__ = {"eager_defaults": True}
     
     id: int = Column(Integer, primary_key=True, autoincrement=True)
     username: str = Column(String(100), unique=True, nullable=False, index=True)
@@ -110,25 +120,138 @@ class AdminUser(Base):
     last_login = Column(DateTime)
 
 
+def _uuid7() -> uuid.UUID:
+    """Build an RFC 9562 UUIDv7: 48-bit Unix milliseconds followed by random bits."""
+    timestamp_ms = time.time_ns() // 1_000_000
+    rand = int.from_bytes(os.urandom(10), "big")
+    value = (timestamp_ms & 0xFFFF_FFFF_FFFF) << 80
+    value |= 0x7 << 76                              # version 7
+    value |= ((rand >> 62) & 0xFFF) << 64           # rand_a
+    value |= 0b10 << 62                             # RFC 4122 variant
+    value |= rand & 0x3FFF_FFFF_FFFF_FFFF           # rand_b
+    return uuid.UUID(int=value)
+
+
 def generate_unique_id() -> str:
-    """Generate a unique ID for users."""
-    return str(uuid.uuid4())
+    """
+    Generate a unique ID for users.
+
+    IDs are time-ordered UUIDv7 values so new rows land at the end of the
+    user_id index instead of on random B-tree pages.
+    """
+    return str(getattr(uuid, "uuid7", _uuid7)())
 
 
 def generate_realm_id() -> str:
     """Generate a unique realm ID."""
-    return f"realm_{uuid.uuid4().hex[:8]}"
+    return f"realm_{secrets.token_hex(4)}"
+
+
+# Database configuration
+DATABASE_URL = os.getenv("DATABASE_URL", "sqlite:///scim_database.db")
+DB_POOL_SIZE = int(os.getenv("DB_POOL_SIZE", "20"))
+DB_MAX_OVERFLOW = int(os.getenv("DB_MAX_OVERFLOW", "40"))
+
+# Applied to every new SQLite connection. WAL lets readers proceed during a
+# write, and synchronous=NORMAL is durable across application crashes in
+# WAL mode while skipping an fsync per commit.
+SQLITE_PRAGMAS = (
+    "PRAGMA journal_mode=WAL",
+    "PRAGMA synchronous=NORMAL",
+    "PRAGMA temp_store=MEMORY",
+    "PRAGMA mmap_size=268435456",
+)
+
+
+def _engine_options(url: str) -> Dict[str, Any]:
+    """Build connection pool options for the configured database URL."""
+    if url.startswith("sqlite"):
+        # SQLite connections are shared across FastAPI's worker threads
+        options: Dict[str, Any] = {"connect_args": {"check_same_thread": False}}
+        if url in ("sqlite://", "sqlite:///:memory:"):
+            # In-memory databases only exist for a single connection
+            options["poolclass"] = StaticPool
+        else:
+            # One connection per concurrently running handler thread
+            options["pool_size"] = DB_POOL_SIZE
+            options["max_overflow"] = DB_MAX_OVERFLOW
+        return options
+
+    # Server databases: keep a bounded pool of warm connections. LIFO checkout
+    # reuses the most recently returned connection so idle ones can expire.
+    return {
+        "pool_size": DB_POOL_SIZE,
+        "max_overflow": DB_MAX_OVERFLOW,
+        "pool_timeout": 30,
+        "pool_recycle": 1800,
+        "pool_pre_ping": True,
+        "pool_use_lifo": True,
+    }
 
 
 # Database engine and session factory
-engine = create_engine('sqlite:///scim_database.db', echo=False)
-SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
+engine = create_engine(
+    DATABASE_URL,
+    echo=False,
+    json_serializer=lambda value: orjson.dumps(value).decode(),
+    json_deserializer=orjson.loads,
+    **_engine_options(DATABASE_URL)
+)
+
+
+@event.listens_for(engine, "connect")
+def _set_sqlite_pragmas(dbapi_connection, connection_record) -> None:
+    """Tune each new SQLite connection for concurrent request handling."""
+    if engine.dialect.name != "sqlite":
+        return
+    cursor = dbapi_connection.cursor()
+    try:
+        for pragma in SQLITE_PRAGMAS:
+            cursor.execute(pragma)
+    finally:
+        cursor.close()
+
+
+# Objects stay loaded after commit; handlers serialize them right away and
+# re-selecting every attribute would cost an extra round trip per write.
+SessionLocal = sessionmaker(autocommit=False, autoflush=False, expire_on_commit=False, bind=engine)
+
+
+# Indexes superseded by the (realm_id, ...) composite indexes. Every lookup is
+# scoped to a realm, so these only cost write I/O. idx_realm_username is the
+# non-unique predecessor of uq_realm_username.
+OBSOLETE_INDEXES = {
+    'scim_users': ('ix_scim_users_userName', 'ix_scim_users_externalId', 'idx_realm_username'),
+    'scim_idp': ('ix_scim_idp_userName', 'ix_scim_idp_externalId'),
+}
+
+
+# Set to "1" by launchers that create tables before starting server workers
+SKIP_CREATE_TABLES_ENV = "SCIM_SKIP_CREATE_TABLES"
 
 
 def create_tables() -> None:
-    """Create all database tables."""
+    """Create all database tables and any indexes added since they were created."""
     Base.metadata.create_all(bind=engine)
 
+    # create_all() skips the indexes of tables that already exist
+    for table in Base.metadata.sorted_tables:
+        for index in table.indexes:
+            try:
+                index.create(bind=engine, checkfirst=True)
+            except SQLAlchemyError as e:
+                # e.g. existing duplicate rows prevent a unique index
+                logger.warning("Could not create index %s: %s", index.name, e)
+
+    # ...and never drops indexes that were removed from the models
+    reflected = MetaData()
+    for table_name, index_names in OBSOLETE_INDEXES.items():
+        table = Table(table_name, reflected, autoload_with=engine)
+        for index in list(table.indexes):
+            if index.name in index_names:
+                index.drop(bind=engine)
+                logger.info("Dropped obsolete index %s", index.name)
+
 
 def get_db():
     """Database dependency for FastAPI."""
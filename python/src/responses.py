@@ -0,0 +1,15 @@
+"""
+Response classes for SCIM 2.0 endpoints.
+"""
+
+from fastapi.responses import JSONResponse
+from typing import Any
+import orjson
+
+
+class ORJSONResponse(JSONResponse):
+    """JSON response rendered with orjson instead of the stdlib encoder."""
+
+    def render(self, content: Any) -> bytes:
+        """Serialize response content to JSON bytes."""
+        return orjson.dumps(content, option=orjson.OPT_NON_STR_KEYS)
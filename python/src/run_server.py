@@ -5,15 +5,10 @@ This script initializes the database and starts the SCIM endpoints server.
 """
 
 import logging
-import uvicorn
 
-from .init_db import init_database
+from .app import serve
 
-# Configure logging
-logging.basicConfig(
-    level=logging.INFO,
-    format="%(asctime)s - %(name)s - %(levelname)s - %(message)s"
-)
+# Logging is configured by src.app on import
 logger = logging.getLogger(__name__)
 
 
@@ -22,25 +17,14 @@ def run_server() -> None:
     logger.info("Starting SCIM 2.0 Endpoints server...")
     
     try:
-        # Initialize database
-        logger.info("Initializing database...")
-        init_database()
-        
-        # Run HTTP server
+        # Initialize the database and run the HTTP server
         logger.info("Starting server on HTTP port 8000...")
         logger.info("Access the API at: http://localhost:8000")
         logger.info("API Documentation: http://localhost:8000/docs")
-        
-        uvicorn.run(
-            "src.app:app",
-            host="0.0.0.0",
-            port=8000,
-            reload=True,
-            log_level="info"
-        )
+        serve()
             
     except Exception as e:
-        logger.error(f"Failed to start server: {str(e)}")
+        logger.error("Failed to start server: %s", e)
         raise
 
 
@@ -2,16 +2,35 @@
 Pydantic schemas for SCIM 2.0 endpoints validation.
 """
 
-from pydantic import BaseModel, Field, EmailStr, validator
-from typing import List, Optional, Dict, Any
+from pydantic import BaseModel, ConfigDict, Field, EmailStr, StringConstraints, field_validator
+from typing import Annotated, List, Literal, Optional, Dict, Any
 from datetime import datetime
+import re
+
+# SCIM message schema URIs
+LIST_RESPONSE_SCHEMA = "urn:ietf:params:scim:api:messages:2.0:ListResponse"
+BULK_REQUEST_SCHEMA = "urn:ietf:params:scim:api:messages:2.0:BulkRequest"
+BULK_RESPONSE_SCHEMA = "urn:ietf:params:scim:api:messages:2.0:BulkResponse"
+ERROR_SCHEMA = "urn:ietf:params:scim:api:messages:2.0:Error"
+
+# Most operations accepted in a single bulk request
+MAX_BULK_OPERATIONS = 1000
+
+# Structural email check for provisioned users. Evaluated by pydantic-core's
+# compiled regex engine instead of the email-validator package that EmailStr
+# calls per value; admin accounts keep the stricter EmailStr.
+EMAIL_RE = re.compile(r"^[A-Za-z0-9._%+-]+@[A-Za-z0-9.-]+\.[A-Za-z]{2,}$")
+EmailAddress = Annotated[str, StringConstraints(pattern=EMAIL_RE.pattern, max_length=254)]
 
 
 class EmailSchema(BaseModel):
     """SCIM Email schema."""
-    value: EmailStr = Field(..., description="Email address")
+    value: EmailAddress = Field(..., description="Email address")
     primary: bool = Field(default=False, description="Primary email indicator")
 
+    # Immutable once validated; user payloads can carry many of these
+    model_config = ConfigDict(frozen=True)
+
 
 class SCIMUserCreate(BaseModel):
     """Schema for creating SCIM users."""
@@ -25,21 +44,19 @@ class SCIMUserCreate(BaseModel):
     surName: str = Field(..., min_length=1, max_length=100, description="Surname")
     displayName: str = Field(..., min_length=1, max_length=200, description="Display name")
     active: bool = Field(default=True, description="Active status")
-    emails: List[EmailSchema] = Field(..., min_items=1, description="Email addresses")
+    emails: List[EmailSchema] = Field(..., min_length=1, description="Email addresses")
 
-    @validator('emails')
+    @field_validator('emails')
+    @classmethod
     def validate_primary_email(cls, v):
         """Ensure at least one primary email exists."""
-        if not any(email.primary for email in v):
-            v[0].primary = True  # Set first email as primary if none specified
+        for email in v:
+            if email.primary:
+                return v
+        # Set first email as primary if none specified
+        v[0] = v[0].model_copy(update={"primary": True})
         return v
 
-    class Config:
-        """Pydantic config."""
-        json_encoders = {
-            datetime: lambda v: v.isoformat()
-        }
-
 
 class SCIMUserUpdate(BaseModel):
     """Schema for updating SCIM users."""
@@ -52,11 +69,16 @@ class SCIMUserUpdate(BaseModel):
     active: Optional[bool] = Field(None, description="Active status")
     emails: Optional[List[EmailSchema]] = Field(None, description="Email addresses")
 
-    @validator('emails')
+    @field_validator('emails')
+    @classmethod
     def validate_primary_email(cls, v):
         """Ensure at least one primary email exists if emails provided."""
-        if v and not any(email.primary for email in v):
-            v[0].primary = True
+        if not v:
+            return v
+        for email in v:
+            if email.primary:
+                return v
+        v[0] = v[0].model_copy(update={"primary": True})
         return v
 
 
@@ -73,21 +95,60 @@ class SCIMUserResponse(BaseModel):
     emails: List[EmailSchema] = Field(..., description="Email addresses")
     meta: Dict[str, Any] = Field(..., description="Metadata")
 
-    class Config:
-        """Pydantic config."""
-        from_attributes = True
+    model_config = ConfigDict(from_attributes=True)
 
 
 class SCIMUserListResponse(BaseModel):
     """Schema for SCIM user list response."""
     schemas: List[str] = Field(
-        default=["urn:ietf:params:scim:api:messages:2.0:ListResponse"],
+        default=[LIST_RESPONSE_SCHEMA],
         description="SCIM schemas"
     )
     totalResults: int = Field(..., description="Total number of results")
     startIndex: int = Field(default=1, description="Start index")
     itemsPerPage: int = Field(..., description="Items per page")
     Resources: List[SCIMUserResponse] = Field(..., description="User resources")
+    nextCursor: Optional[str] = Field(None, description="Cursor for the next page, if any")
+
+
+class BulkOperation(BaseModel):
+    """A single operation within a SCIM bulk request."""
+    method: Literal["POST", "PUT", "DELETE"] = Field(..., description="HTTP method of the operation")
+    path: str = Field(..., description="Resource path, e.g. /Users or /Users/{id}")
+    bulkId: Optional[str] = Field(None, description="Client identifier echoed in the result")
+    data: Optional[Dict[str, Any]] = Field(None, description="User data for POST and PUT")
+
+
+class BulkRequest(BaseModel):
+    """Schema for SCIM bulk requests."""
+    schemas: List[str] = Field(
+        default=[BULK_REQUEST_SCHEMA],
+        description="SCIM schemas"
+    )
+    failOnErrors: Optional[int] = Field(
+        None, ge=1, description="Stop processing after this many failed operations"
+    )
+    Operations: List[BulkOperation] = Field(
+        ..., min_length=1, max_length=MAX_BULK_OPERATIONS, description="Operations to perform in order"
+    )
+
+
+class BulkOperationResult(BaseModel):
+    """Result of a single bulk operation."""
+    method: str = Field(..., description="HTTP method of the operation")
+    bulkId: Optional[str] = Field(None, description="Client identifier from the request")
+    location: Optional[str] = Field(None, description="Location of the affected user")
+    status: str = Field(..., description="HTTP status code of the operation")
+    response: Optional[Dict[str, Any]] = Field(None, description="SCIM error for failed operations")
+
+
+class BulkResponse(BaseModel):
+    """Schema for SCIM bulk responses."""
+    schemas: List[str] = Field(
+        default=[BULK_RESPONSE_SCHEMA],
+        description="SCIM schemas"
+    )
+    Operations: List[BulkOperationResult] = Field(..., description="Operation results")
 
 
 class RealmCreate(BaseModel):
@@ -104,9 +165,7 @@ class RealmResponse(BaseModel):
     description: Optional[str] = Field(None, description="Realm description")
     created_at: datetime = Field(..., description="Creation timestamp")
 
-    class Config:
-        """Pydantic config."""
-        from_attributes = True
+    model_config = ConfigDict(from_attributes=True)
 
 
 class AdminUserCreate(BaseModel):
@@ -124,15 +183,13 @@ class AdminUserResponse(BaseModel):
     is_active: bool = Field(..., description="Active status")
     created_at: datetime = Field(..., description="Creation timestamp")
 
-    class Config:
-        """Pydantic config."""
-        from_attributes = True
+    model_config = ConfigDict(from_attributes=True)
 
 
 class ErrorResponse(BaseModel):
     """Schema for error responses."""
     schemas: List[str] = Field(
-        default=["urn:ietf:params:scim:api:messages:2.0:Error"],
+        default=[ERROR_SCHEMA],
         description="Error schema"
     )
     detail: str = Field(..., description="Error detail")
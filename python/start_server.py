@@ -7,7 +7,6 @@ Run from the python directory: python start_server.py
 """
 
 import logging
-import uvicorn
 import sys
 from pathlib import Path
 
@@ -17,13 +16,9 @@ src_dir = current_dir / "src"
 sys.path.insert(0, str(src_dir))
 
 # Now we can import from src
-from src.init_db import init_database
+from src.app import serve
 
-# Configure logging
-logging.basicConfig(
-    level=logging.INFO,
-    format="%(asctime)s - %(name)s - %(levelname)s - %(message)s"
-)
+# Logging is configured by src.app on import
 logger = logging.getLogger(__name__)
 
 
@@ -32,11 +27,7 @@ def main():
     logger.info("Starting SCIM 2.0 Endpoints Server...")
     
     try:
-        # Initialize database
-        logger.info("Initializing database...")
-        init_database()
-        
-        # Start the server
+        # Initialize the database and start the server
         logger.info("Starting FastAPI server...")
         logger.info("Server will be available at:")
         logger.info("  - HTTP: http://localhost:8000")
@@ -44,19 +35,12 @@ def main():
         logger.info("Default admin credentials: admin/admin123")
         logger.info("Press Ctrl+C to stop the server")
         
-        # Start HTTP server
-        uvicorn.run(
-            "src.app:app",
-            host="0.0.0.0",
-            port=8000,
-            reload=False,
-            log_level="info"
-        )
+        serve()
         
     except KeyboardInterrupt:
         logger.info("Server stopped by user")
     except Exception as e:
-        logger.error(f"Failed to start server: {str(e)}")
+        logger.error("Failed to start server: %s", e)
         raise
 
 